@@ -27,7 +27,12 @@ def main():
             path = Path(path)
             if path.suffix.lower() != ".xml":
                 continue
-            shutil.copy2(path, dest_dir / path.name)
+            # public/ is recreated every run, so a hardlink is enough; fall
+            # back to copying when it is on another filesystem.
+            try:
+                os.link(path, dest_dir / path.name)
+            except OSError:
+                shutil.copy2(path, dest_dir / path.name)
         logging.info("Published %s feeds to %s", source.SLUG, dest_dir)
 
 
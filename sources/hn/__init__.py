@@ -1,32 +1,88 @@
+import asyncio
+import base64
+import binascii
 import datetime
+import functools
+import hashlib
 import html
-import json
 import logging
 import os
+import re
 import time
-import xml.etree.ElementTree as ET
 from pathlib import Path
+from xml.sax.saxutils import escape as xml_escape
 
+import aiohttp
+import lxml.html
+import numpy as np
+import orjson
 import requests
-from bs4 import BeautifulSoup
-from openai import OpenAI
+from lxml import etree as ET
+from openai import AsyncOpenAI
 from readability import Document
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 SLUG = "hn"
 SOURCE_NAME = "Hacker News"
 HN_API = "https://hacker-news.firebaseio.com/v0"
+USER_AGENT = "news-digest-bot/1.0"
 
 BASE_DIR = Path(__file__).resolve().parent
 STATE_PATH = BASE_DIR / "state.json"
 OUT_DIR = BASE_DIR / "out"  # gitignored
+SUMMARY_CACHE_DIR = BASE_DIR / "summary_cache"  # gitignored
+SUMMARY_CACHE_TTL = 7 * 24 * 3600
+SUMMARY_MODEL = "gpt-4.1-mini"
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIM = 1536
+SIMILARITY_THRESH = 0.92
+# Shorter extractions are usually consent walls, paywall teasers or empty
+# JS-rendered pages, which look alike across unrelated stories.
+MIN_SIMILARITY_CHARS = 500
 
 THRESH = 100
 MAX_ITEMS_PER_GEN = 10
 PAGE_SIZE = 200
 MAX_HISTORY_ENTRIES = 200
 TOP_STORIES_SIZE = 500
+SCAN_CONCURRENCY = 32
+THREAD_TEXT_LIMIT = 400_000  # characters of thread text sent to the LLM
+REFETCH_AFTER = 10 * 60  # seconds before a scanned story is fetched again
+FETCH_ATTEMPTS = 3
+RETRY_BACKOFF = 0.5  # seconds, doubled after each failed attempt
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 ATOM_NS = "http://www.w3.org/2005/Atom"
-ET.register_namespace("", ATOM_NS)
+FEED_TITLE = f"News digest bot ({SOURCE_NAME} 100+ points)"
+# Everything that is the same on every page (namespace, title, the HN link)
+# is baked into the templates once at import time.
+FEED_HEAD_TMPL = (
+    '<?xml version="1.0" encoding="utf-8"?>\n'
+    f'<feed xmlns="{ATOM_NS}">\n'
+    f"<title>{xml_escape(FEED_TITLE)}</title>\n"
+    "<id>{id}</id>\n"
+    "<updated>{updated}</updated>\n"
+    '<link rel="self" href="{self_href}" type="application/atom+xml"/>\n'
+    '<link rel="current" href="{current_href}" type="application/atom+xml"/>\n'
+    '<link rel="alternate" href="https://news.ycombinator.com/"/>\n'
+    "{archive_links}"
+)
+LINK_TMPL = '<link rel="{rel}" href="{href}"/>\n'
+ENTRY_ALTERNATE_LINK_TMPL = '<link rel="alternate" href="{href}"/>\n'
+ENTRY_RELATED_LINK_TMPL = '<link rel="related" href="{href}" title="HN comments"/>\n'
+ENTRY_TMPL = (
+    "<entry>\n"
+    "<title>{title}</title>\n"
+    "<id>{id}</id>\n"
+    "<updated>{updated}</updated>\n"
+    "<published>{published}</published>\n"
+    "{links}"
+    '<summary type="html">{summary}</summary>\n'
+    "</entry>\n"
+)
+FEED_TAIL = "</feed>\n"
+_esc = functools.lru_cache(maxsize=4096)(html.escape)
+_BULLET_RE = re.compile(r"^\s*-[ \t]*(\S.*?)\s*$", re.M)
 
 
 def entry_key(data):
@@ -35,47 +91,166 @@ def entry_key(data):
     )
 
 
+UTF8_HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
 logger = logging.getLogger(__name__)
-client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
+client = AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
+
+# Only topstories.json still goes through requests; it gets the same retry
+# policy as the aiohttp fetches below.
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        max_retries=Retry(
+            total=FETCH_ATTEMPTS - 1,
+            backoff_factor=RETRY_BACKOFF,
+            status_forcelist=sorted(RETRY_STATUSES),
+        )
+    ),
+)
 
 
 def get_json(url, timeout=20):
-    r = requests.get(url, timeout=timeout)
+    r = SESSION.get(url, timeout=timeout)
     r.raise_for_status()
     return r.json()
 
 
-def hn_item(item_id: int):
-    return get_json(f"{HN_API}/item/{item_id}.json")
+async def get_with_retry(session, url, read):
+    """GET ``url`` and return ``await read(response)``, retrying transient failures."""
+    for attempt in range(FETCH_ATTEMPTS):
+        last_attempt = attempt == FETCH_ATTEMPTS - 1
+        try:
+            async with session.get(url) as r:
+                r.raise_for_status()
+                return await read(r)
+        except aiohttp.ClientResponseError as e:
+            if e.status not in RETRY_STATUSES or last_attempt:
+                raise
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if last_attempt:
+                raise
+        await asyncio.sleep(RETRY_BACKOFF * 2**attempt)
+
+
+async def fetch_item(session, item_id: int):
+    return await get_with_retry(
+        session, f"{HN_API}/item/{item_id}.json", lambda r: r.json()
+    )
 
 
-def strip_text_from_html(html: str) -> str:
-    soup = BeautifulSoup(html, "lxml")
-    for t in soup(["script", "style", "noscript"]):
-        t.decompose()
-    return " ".join(soup.get_text(" ").split())
+def client_session(limit, timeout):
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=limit),
+        # Like requests' timeout: bounds connecting and each read, not the
+        # whole download, so large but steadily streaming pages still fetch.
+        timeout=aiohttp.ClientTimeout(
+            total=None, sock_connect=timeout, sock_read=timeout
+        ),
+        headers={"User-Agent": USER_AGENT},
+    )
 
 
-def fetch_article_text(url: str, limit_chars=30000) -> str:
-    r = requests.get(url, timeout=25, headers={"User-Agent": "news-digest-bot/1.0"})
-    r.raise_for_status()
-    doc = Document(r.text)
-    main_html = doc.summary(html_partial=True)
-    text = strip_text_from_html(main_html)
-    return text[:limit_chars]
+async def gather_with_sem(ids, limit):
+    sem = asyncio.Semaphore(limit)
+    async with client_session(limit, timeout=20) as session:
+
+        async def bounded(item_id):
+            async with sem:
+                return await fetch_item(session, item_id)
+
+        # A failed item comes back as its exception instead of aborting the scan
+        # (and the requests still in flight) with it.
+        return await asyncio.gather(
+            *(bounded(item_id) for item_id in ids), return_exceptions=True
+        )
+
+
+class TextTarget:
+    """lxml parser target that collects visible text without building a tree."""
+
+    SKIP_TAGS = {"script", "style", "noscript"}
+
+    def __init__(self):
+        self.buf = []
+        self.skip = 0
 
+    def start(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self.skip += 1
+        self.buf.append(" ")
 
-def fetch_hn_thread_html(comments_url: str, limit_chars=400_000) -> str:
-    r = requests.get(
-        comments_url, timeout=25, headers={"User-Agent": "news-digest-bot/1.0"}
+    def end(self, tag):
+        if tag in self.SKIP_TAGS and self.skip:
+            self.skip -= 1
+        self.buf.append(" ")
+
+    def data(self, data):
+        if not self.skip:
+            self.buf.append(data)
+
+    def close(self):
+        return " ".join("".join(self.buf).split())
+
+
+def element_text(el) -> str:
+    return " ".join(" ".join(el.itertext()).split())
+
+
+def strip_text_from_html(html: str) -> str:
+    if not html or not html.strip():
+        return ""
+    parser = ET.HTMLParser(target=TextTarget())
+    parser.feed(html)
+    return parser.close()
+
+
+def parse_article_text(page: str, limit_chars=30000) -> str:
+    # Parse once and hand the tree to readability: its retry passes then copy
+    # the tree instead of re-tokenizing the page, and summary() leaves the
+    # cleaned article element in doc.html, so the result is not parsed again.
+    root = lxml.html.document_fromstring(
+        page.encode("utf-8", "replace"), parser=UTF8_HTML_PARSER
+    )
+    doc = Document(root)
+    doc.summary(html_partial=True)
+    main_el = doc.html
+    ET.strip_elements(main_el, "script", "style", "noscript", with_tail=False)
+    return element_text(main_el)[:limit_chars]
+
+
+async def fetch_article_text(session, url: str, limit_chars=30000) -> str:
+    page = await get_with_retry(session, url, lambda r: r.text(errors="replace"))
+    # readability + lxml take tens of ms on large pages; keep the loop free
+    # for the other in-flight requests while they run.
+    return await asyncio.to_thread(parse_article_text, page, limit_chars)
+
+
+def extract_hn_comments_text(html: str) -> str:
+    """Reduce an HN thread page to comment text, indented two spaces per reply level."""
+    root = lxml.html.fromstring(html)
+    lines = []
+    for row in root.xpath("//tr[contains(concat(' ', @class, ' '), ' comtr ')]"):
+        texts = row.xpath(".//div[contains(concat(' ', @class, ' '), ' commtext ')]")
+        if not texts:
+            continue  # deleted/flagged comment
+        indent = row.xpath("string(.//td[@class='ind']/@indent)")
+        if not indent:
+            indent = int(row.xpath("string(.//td[@class='ind']/img/@width)") or 0) // 40
+        lines.append("  " * int(indent) + element_text(texts[0]) + "\n")
+    return "".join(lines)
+
+
+async def fetch_hn_thread_html(session, comments_url: str) -> str:
+    return await get_with_retry(
+        session, comments_url, lambda r: r.text(errors="replace")
     )
-    r.raise_for_status()
-    return r.text[:limit_chars]
 
 
-def summarize(system, user):
-    resp = client.responses.create(
-        model="gpt-4.1-mini",
+async def summarize(system, user):
+    resp = await client.responses.create(
+        model=SUMMARY_MODEL,
         input=[
             {"role": "system", "content": system},
             {"role": "user", "content": user},
@@ -84,11 +259,112 @@ def summarize(system, user):
     return resp.output_text.strip()
 
 
+def cache_path(*parts):
+    key = hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+    return SUMMARY_CACHE_DIR / key[:2] / key
+
+
+def read_cache(path):
+    try:
+        if time.time() - path.stat().st_mtime < SUMMARY_CACHE_TTL:
+            return path.read_bytes()
+    except OSError:
+        pass
+    return None
+
+
+def write_cache(path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+async def cached_summarize(system, user):
+    path = cache_path(SUMMARY_MODEL, system, user)
+    cached = read_cache(path)
+    if cached is not None:
+        return cached.decode("utf-8")
+    summary = await summarize(system, user)
+    write_cache(path, summary.encode("utf-8"))
+    return summary
+
+
+def prune_summary_cache():
+    cutoff = time.time() - SUMMARY_CACHE_TTL
+    removed = 0
+    for path in SUMMARY_CACHE_DIR.glob("*/*"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError:
+            logger.warning("Failed to remove expired cache entry %s", path)
+    if removed:
+        logger.info("Removed %d expired summary cache entries", removed)
+
+
+async def embed(text):
+    # Cached next to the summaries so a rerun does not pay for the embedding
+    # call before it gets to the summary cache hit.
+    text = text[:8000]
+    path = cache_path(EMBEDDING_MODEL, text)
+    cached = read_cache(path)
+    if cached is not None and len(cached) == EMBEDDING_DIM * 4:
+        return np.frombuffer(cached, dtype=np.float32)
+    resp = await client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+    vec = np.asarray(resp.data[0].embedding, dtype=np.float32)
+    vec = vec / np.linalg.norm(vec)
+    write_cache(path, vec.tobytes())
+    return vec
+
+
+def encode_embedding(vec) -> str:
+    return base64.b64encode(vec.astype(np.float32).tobytes()).decode("ascii")
+
+
+def decode_embedding(data: str):
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32)
+
+
+def build_summary_index(entries):
+    """Stack stored article embeddings so new articles can be matched in one dot."""
+    vecs, summaries, skipped = [], [], 0
+    for e in entries:
+        if not (e.get("embedding") and e.get("article_summary")):
+            continue
+        try:
+            vec = decode_embedding(e["embedding"])
+        except (binascii.Error, TypeError, ValueError):
+            vec = None
+        # corrupt, or written by a different EMBEDDING_MODEL
+        if vec is None or vec.shape != (EMBEDDING_DIM,):
+            skipped += 1
+            continue
+        vecs.append(vec)
+        summaries.append(e["article_summary"])
+    if skipped:
+        logger.warning(
+            "Ignoring %d stored embeddings not usable with %s", skipped, EMBEDDING_MODEL
+        )
+    if not vecs:
+        return None
+    return np.stack(vecs), summaries
+
+
+def find_similar_summary(index, vec):
+    if index is None:
+        return None
+    vecs, summaries = index
+    dots = vecs @ vec
+    best = int(dots.argmax())
+    if dots[best] >= SIMILARITY_THRESH:
+        return summaries[best]
+    return None
+
+
 def load_state():
     if not STATE_PATH.exists():
-        return {"last_scores": {}, "feed_entries": []}
-    with STATE_PATH.open("r", encoding="utf-8") as f:
-        data = json.load(f)
+        return {"last_scores": {}, "last_fetched": {}, "feed_entries": []}
+    data = orjson.loads(STATE_PATH.read_bytes())
 
     def parse_dt(dt_str):
         if not dt_str:
@@ -109,30 +385,23 @@ def load_state():
 
     return {
         "last_scores": data.get("last_scores", {}),
+        "last_fetched": data.get("last_fetched", {}),
         "feed_entries": feed_entries,
     }
 
 
 def save_state(state):
-    def to_serializable(entries):
-        out = []
-        for e in entries:
-            item = dict(e)
-            dt = item.get("published_at")
-            if isinstance(dt, datetime.datetime):
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=datetime.timezone.utc)
-                item["published_at"] = dt.isoformat()
-            out.append(item)
-        return out
-
     state_to_save = {
         "last_scores": state.get("last_scores", {}),
-        "feed_entries": to_serializable(state.get("feed_entries", [])),
+        "last_fetched": state.get("last_fetched", {}),
+        "feed_entries": state.get("feed_entries", []),
     }
     STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with STATE_PATH.open("w", encoding="utf-8") as f:
-        json.dump(state_to_save, f, ensure_ascii=False, indent=2)
+    # orjson writes datetimes as RFC 3339 strings (naive ones as UTC), which
+    # load_state() parses back with fromisoformat.
+    STATE_PATH.write_bytes(
+        orjson.dumps(state_to_save, option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC)
+    )
 
 
 def isoformat(dt: datetime.datetime | None) -> str:
@@ -152,44 +421,61 @@ def render_summary_html(entry: dict) -> str:
     comments_summary = entry.get("comments_summary") or ""
 
     parts = [
-        f"<p><strong>Points:</strong> {html.escape(str(points) if points is not None else 'n/a')}</p>",
+        f"<p><strong>Points:</strong> {_esc(str(points) if points is not None else 'n/a')}</p>",
     ]
 
     parts.append(
-        f"<p><strong>Total comments:</strong> {html.escape(str(comments_count) if comments_count is not None else 'n/a')}</p>"
+        f"<p><strong>Total comments:</strong> {_esc(str(comments_count) if comments_count is not None else 'n/a')}</p>"
     )
 
     if main_link:
-        esc = html.escape(main_link)
+        esc = _esc(main_link)
         parts.append(f'<p><strong>Link:</strong> <a href="{esc}">{esc}</a></p>')
     else:
         parts.append("<p><strong>Link:</strong> (none)</p>")
 
-    parts.append(
-        f"<p><strong>Article summary:</strong> {html.escape(article_summary)}</p>"
-    )
+    parts.append(f"<p><strong>Article summary:</strong> {_esc(article_summary)}</p>")
 
-    bullet_items = [
-        line[1:].strip() if line.strip().startswith("-") else None
-        for line in comments_summary.splitlines()
-    ]
-    bullet_items = [b.lstrip() for b in bullet_items if b]
+    bullet_items = _BULLET_RE.findall(comments_summary)
 
     if bullet_items:
-        items_html = "".join(f"<li>{html.escape(item)}</li>" for item in bullet_items)
+        items_html = "".join(f"<li>{_esc(item)}</li>" for item in bullet_items)
         parts.append(f"<p><strong>Comments summary:</strong></p><ul>{items_html}</ul>")
     else:
         parts.append(
-            f"<p><strong>Comments summary:</strong> {html.escape(comments_summary)}</p>"
+            f"<p><strong>Comments summary:</strong> {_esc(comments_summary)}</p>"
         )
 
     if comments_link:
-        esc = html.escape(comments_link)
+        esc = _esc(comments_link)
         parts.append(f'<p><strong>HN thread:</strong> <a href="{esc}">{esc}</a></p>')
 
     return "".join(parts)
 
 
+def xml_attr(value: str) -> str:
+    return xml_escape(value, {'"': "&quot;"})
+
+
+def render_atom_entry(e: dict, generated_at: datetime.datetime) -> str:
+    published = isoformat(e.get("published_at") or generated_at)
+    links = ""
+    if e.get("link"):
+        links += ENTRY_ALTERNATE_LINK_TMPL.format(href=xml_attr(e["link"]))
+    if e.get("comments"):
+        links += ENTRY_RELATED_LINK_TMPL.format(href=xml_attr(e["comments"]))
+    return ENTRY_TMPL.format(
+        title=xml_escape(e["title"]),
+        id=xml_escape(
+            f"urn:news-digest:{e.get('id') or e.get('comments') or e.get('link')}"
+        ),
+        updated=published,
+        published=published,
+        links=links,
+        summary=xml_escape(render_summary_html(e)),
+    )
+
+
 def write_atom_feeds(entries, generated_at: datetime.datetime, base_url: str | None):
     base_url = base_url.rstrip("/") if base_url else ""
     total_entries = len(entries)
@@ -199,6 +485,9 @@ def write_atom_feeds(entries, generated_at: datetime.datetime, base_url: str | N
     def feed_filename(idx: int) -> str:
         return "feed.xml" if idx == 0 else f"feed-{idx}.xml"
 
+    def feed_href(idx: int) -> str:
+        return f"{base_url}/{feed_filename(idx)}" if base_url else feed_filename(idx)
+
     OUT_DIR.mkdir(parents=True, exist_ok=True)
 
     for idx in range(total_pages):
@@ -207,115 +496,35 @@ def write_atom_feeds(entries, generated_at: datetime.datetime, base_url: str | N
         page_entries = entries[start:end]
 
         filename = feed_filename(idx)
-        self_href = f"{base_url}/{filename}" if base_url else filename
-        current_href = (
-            f"{base_url}/{feed_filename(0)}" if base_url else feed_filename(0)
-        )
+        self_href = feed_href(idx)
 
-        feed = ET.Element(f"{{{ATOM_NS}}}feed")
-        ET.SubElement(
-            feed, f"{{{ATOM_NS}}}title"
-        ).text = f"News digest bot ({SOURCE_NAME} 100+ points)"
-        ET.SubElement(feed, f"{{{ATOM_NS}}}id").text = self_href or "urn:news-digest"
-        ET.SubElement(feed, f"{{{ATOM_NS}}}updated").text = isoformat(generated_at)
-        ET.SubElement(
-            feed,
-            f"{{{ATOM_NS}}}link",
-            {
-                "rel": "self",
-                "href": self_href,
-                "type": "application/atom+xml",
-            },
-        )
-        ET.SubElement(
-            feed,
-            f"{{{ATOM_NS}}}link",
-            {
-                "rel": "current",
-                "href": current_href,
-                "type": "application/atom+xml",
-            },
-        )
-        ET.SubElement(
-            feed,
-            f"{{{ATOM_NS}}}link",
-            {"rel": "alternate", "href": "https://news.ycombinator.com/"},
-        )
-
-        if idx == 0 and total_pages > 1:
-            next_href = (
-                f"{base_url}/{feed_filename(idx + 1)}"
-                if base_url
-                else feed_filename(idx + 1)
-            )
-            ET.SubElement(
-                feed, f"{{{ATOM_NS}}}link", {"rel": "next-archive", "href": next_href}
-            )
-            ET.SubElement(
-                feed, f"{{{ATOM_NS}}}link", {"rel": "next", "href": next_href}
-            )
+        archive_links = []
         if idx > 0:
-            prev_href = (
-                f"{base_url}/{feed_filename(idx - 1)}"
-                if base_url
-                else feed_filename(idx - 1)
-            )
-            ET.SubElement(
-                feed, f"{{{ATOM_NS}}}link", {"rel": "prev-archive", "href": prev_href}
-            )
-            ET.SubElement(
-                feed, f"{{{ATOM_NS}}}link", {"rel": "prev", "href": prev_href}
-            )
-            if idx < total_pages - 1:
-                next_href = (
-                    f"{base_url}/{feed_filename(idx + 1)}"
-                    if base_url
-                    else feed_filename(idx + 1)
-                )
-                ET.SubElement(
-                    feed,
-                    f"{{{ATOM_NS}}}link",
-                    {"rel": "next-archive", "href": next_href},
-                )
-                ET.SubElement(
-                    feed, f"{{{ATOM_NS}}}link", {"rel": "next", "href": next_href}
+            prev_href = xml_attr(feed_href(idx - 1))
+            archive_links.append(LINK_TMPL.format(rel="prev-archive", href=prev_href))
+            archive_links.append(LINK_TMPL.format(rel="prev", href=prev_href))
+        if idx < total_pages - 1:
+            next_href = xml_attr(feed_href(idx + 1))
+            archive_links.append(LINK_TMPL.format(rel="next-archive", href=next_href))
+            archive_links.append(LINK_TMPL.format(rel="next", href=next_href))
+
+        # The Atom schema here is fixed, so the page is emitted from string
+        # templates and streamed to disk one entry at a time; memory stays
+        # flat however large PAGE_SIZE / MAX_HISTORY_ENTRIES grow.
+        out_path = OUT_DIR / filename
+        with out_path.open("w", encoding="utf-8") as f:
+            f.write(
+                FEED_HEAD_TMPL.format(
+                    id=xml_escape(self_href or "urn:news-digest"),
+                    updated=isoformat(generated_at),
+                    self_href=xml_attr(self_href),
+                    current_href=xml_attr(feed_href(0)),
+                    archive_links="".join(archive_links),
                 )
-
-        for e in page_entries:
-            entry_el = ET.SubElement(feed, f"{{{ATOM_NS}}}entry")
-            ET.SubElement(entry_el, f"{{{ATOM_NS}}}title").text = e["title"]
-            entry_id = (
-                f"urn:news-digest:{e.get('id') or e.get('comments') or e.get('link')}"
             )
-            ET.SubElement(entry_el, f"{{{ATOM_NS}}}id").text = entry_id
-
-            published = e.get("published_at") or generated_at
-            ET.SubElement(entry_el, f"{{{ATOM_NS}}}updated").text = isoformat(published)
-            ET.SubElement(entry_el, f"{{{ATOM_NS}}}published").text = isoformat(
-                published
-            )
-
-            main_link = e.get("link")
-            comments_link = e.get("comments")
-            if main_link:
-                ET.SubElement(
-                    entry_el,
-                    f"{{{ATOM_NS}}}link",
-                    {"rel": "alternate", "href": main_link},
-                )
-            if comments_link:
-                ET.SubElement(
-                    entry_el,
-                    f"{{{ATOM_NS}}}link",
-                    {"rel": "related", "href": comments_link, "title": "HN comments"},
-                )
-
-            summary_el = ET.SubElement(entry_el, f"{{{ATOM_NS}}}summary")
-            summary_el.set("type", "html")
-            summary_el.text = render_summary_html(e)
-
-        out_path = OUT_DIR / filename
-        ET.ElementTree(feed).write(out_path, encoding="utf-8", xml_declaration=True)
+            for e in page_entries:
+                f.write(render_atom_entry(e, generated_at))
+            f.write(FEED_TAIL)
         generated_paths.append(out_path)
         logger.info(
             "Wrote Atom feed page %s with %d entries", out_path, len(page_entries)
@@ -333,6 +542,128 @@ def write_atom_feeds(entries, generated_at: datetime.datetime, base_url: str | N
     return generated_paths
 
 
+async def summarize_article(session, item, thread_html, summary_index):
+    """Return ``(article_summary, embedding)``; ``thread_html`` is an awaitable."""
+    item_id = item["id"]
+    title = item.get("title", "(no title)")
+    hn_comments = f"https://news.ycombinator.com/item?id={item_id}"
+    main_url = item.get("url", "")
+
+    if main_url:
+        logger.info("Fetching and summarizing article: %s", main_url)
+        try:
+            article_text = await fetch_article_text(session, main_url)
+            embedding = None
+            if len(article_text) >= MIN_SIMILARITY_CHARS:
+                try:
+                    # the title keeps look-alike bodies of different stories apart
+                    embedding = await embed(f"{title}\n{article_text}")
+                except Exception as e:
+                    logger.warning("Failed to embed article for %s: %s", item_id, e)
+            similar_summary = (
+                find_similar_summary(summary_index, embedding)
+                if embedding is not None
+                else None
+            )
+            if similar_summary is not None:
+                logger.info("Reusing summary of a similar article for %s", item_id)
+                return similar_summary, embedding
+            article_summary = await cached_summarize(
+                "You summarize articles for a technical audience. Keep it concise and focused on facts, one short paragraph.",
+                f"Title: {title}\nURL: {main_url}\n\nArticle text:\n{article_text}",
+            )
+            logger.info("Article summary complete for %s", item_id)
+            return article_summary, embedding
+        except Exception as e:
+            logger.warning("Failed to summarize article for %s: %s", item_id, e)
+            return f"(failed to fetch/summarize article: {e})", None
+
+    # no external link; try HN text body or thread page
+    try:
+        body_html = item.get("text")
+        if body_html:
+            article_text = strip_text_from_html(body_html)
+        else:
+            article_text = await asyncio.to_thread(
+                strip_text_from_html, await thread_html
+            )
+            article_text = article_text[:THREAD_TEXT_LIMIT]
+        article_summary = await cached_summarize(
+            "You summarize Hacker News self-posts or thread content. Keep it concise and focused on the main subject, one short paragraph.",
+            f"Title: {title}\nHN thread: {hn_comments}\n\nThread text:\n{article_text}",
+        )
+        logger.info("Article summary (HN self-post/thread) complete for %s", item_id)
+        return article_summary, None
+    except Exception as e:
+        logger.warning("Failed to summarize HN post/thread for %s: %s", item_id, e)
+        return f"(failed to summarize HN post/thread: {e})", None
+
+
+async def summarize_comments(item, thread_html):
+    item_id = item["id"]
+    title = item.get("title", "(no title)")
+    hn_comments = f"https://news.ycombinator.com/item?id={item_id}"
+
+    logger.info("Fetching and summarizing comments: %s", hn_comments)
+    try:
+        thread_page = await thread_html
+        comments_text = await asyncio.to_thread(extract_hn_comments_text, thread_page)
+        if not comments_text:
+            comments_text = await asyncio.to_thread(strip_text_from_html, thread_page)
+        # Cap the extracted text, not the page: the markup is 5-10x larger and
+        # cutting it would drop most comments of a big thread.
+        comments_text = comments_text[:THREAD_TEXT_LIMIT]
+        comments_summary = await cached_summarize(
+            "You summarize Hacker News comment threads from the comment text in page order, one comment per line, indented two spaces per reply level. Output two parts:\n1) 'Top upvoted themes:' 3-5 bullets reflecting the most upvoted or most visible comments/threads and their arguments (group similar ideas).\n2) 'Overall discussion:' one concise paragraph capturing main themes and disagreements. Avoid quotes and usernames. Focus on the visible ordering of comments as presented in the thread.",
+            f"HN thread: {hn_comments}\nTitle: {title}\n\nHN comments:\n{comments_text}",
+        )
+        logger.info("Comments summary complete for %s", item_id)
+        return comments_summary
+    except Exception as e:
+        logger.warning("Failed to summarize comments for %s: %s", item_id, e)
+        return f"(failed to fetch/summarize comments: {e})"
+
+
+async def process_item(session, score, item, now, summary_index):
+    item_id = item["id"]
+    hn_comments = f"https://news.ycombinator.com/item?id={item_id}"
+    logger.info("Preparing digest entry for %s (%s points)", item_id, score)
+
+    # The comments summary always needs the thread page, and self-posts may
+    # need it for the article summary too, so fetch it once up front.
+    thread_html = asyncio.ensure_future(fetch_hn_thread_html(session, hn_comments))
+    (article_summary, embedding), comments_summary = await asyncio.gather(
+        summarize_article(session, item, thread_html, summary_index),
+        summarize_comments(item, thread_html),
+    )
+
+    return {
+        "id": item_id,
+        "title": item.get("title", "(no title)"),
+        "score": score,
+        "comments": hn_comments,
+        "link": item.get("url", ""),
+        "comments_count": item.get("descendants"),
+        "article_summary": article_summary,
+        "comments_summary": comments_summary,
+        "embedding": encode_embedding(embedding) if embedding is not None else None,
+        "published_at": datetime.datetime.utcfromtimestamp(
+            int(item.get("time", now.timestamp()))
+        ).replace(tzinfo=datetime.timezone.utc),
+    }
+
+
+async def process_crossed(crossed, now, summary_index):
+    # Two connections per story: the article and its HN thread page.
+    async with client_session(2 * MAX_ITEMS_PER_GEN, timeout=25) as session:
+        return await asyncio.gather(
+            *(
+                process_item(session, score, item, now, summary_index)
+                for score, item in crossed
+            )
+        )
+
+
 def run(feed_base_url: str | None = None):
     logger.info(
         "Starting %s digest run (threshold=%s, max_items=%s)",
@@ -341,10 +672,18 @@ def run(feed_base_url: str | None = None):
         MAX_ITEMS_PER_GEN,
     )
     OUT_DIR.mkdir(parents=True, exist_ok=True)
+    prune_summary_cache()
     state = load_state()
     last_scores = {int(k): v for k, v in state.get("last_scores", {}).items()}
+    scan_started = time.time()
+    last_fetched = {
+        int(k): v
+        for k, v in state.get("last_fetched", {}).items()
+        if scan_started - v < REFETCH_AFTER
+    }
     feed_history = state.get("feed_entries", [])
-    seen_keys = {entry_key(e) for e in feed_history}
+    # Keyed once here; reused both to skip known stories and to merge history.
+    history_by_key = {entry_key(e): e for e in feed_history}
     logger.info(
         "Loaded state: %d scores tracked, %d historical entries",
         len(last_scores),
@@ -354,26 +693,38 @@ def run(feed_base_url: str | None = None):
     ids = get_json(f"{HN_API}/topstories.json")[:TOP_STORIES_SIZE]
     logger.info("Fetched %d top stories to scan", len(ids))
 
+    # A story can only become a new candidate while its last known score is
+    # below THRESH and it is not in the feed yet. Stories scanned within the
+    # last REFETCH_AFTER seconds are skipped as well.
+    to_fetch = [
+        item_id
+        for item_id in ids
+        if last_scores.get(item_id, 0) < THRESH
+        and entry_key({"id": item_id}) not in history_by_key
+        and item_id not in last_fetched
+    ]
+    logger.info(
+        "Skipping %d top stories that cannot newly cross the threshold",
+        len(ids) - len(to_fetch),
+    )
+
+    items = asyncio.run(gather_with_sem(to_fetch, SCAN_CONCURRENCY))
+    logger.info("Scanned %d top stories", len(items))
+
     crossed = []
-    for i, item_id in enumerate(ids):
-        item = hn_item(item_id)
+    for item_id, item in zip(to_fetch, items):
+        if isinstance(item, Exception):
+            # leave its state untouched so the next run tries it again
+            logger.warning("Failed to fetch story %s: %s", item_id, item)
+            continue
+        last_fetched[item_id] = scan_started
         if not item or item.get("type") != "story":
             continue
         score = int(item.get("score") or 0)
         prev = int(last_scores.get(item_id, 0))
 
-        title = item.get("title")
-        main_url = item.get("url", "")
-        hn_comments = f"https://news.ycombinator.com/item?id={item_id}"
-        item_key = entry_key(
-            {
-                "id": item_id,
-                "comments": hn_comments,
-                "link": main_url,
-                "title": title,
-            }
-        )
-        if prev < THRESH <= score and item_key not in seen_keys:
+        # stories already in the feed were filtered out of to_fetch above
+        if prev < THRESH <= score:
             crossed.append((score, item))
             logger.info(
                 "Story %s crossed %s points (%s)",
@@ -383,110 +734,19 @@ def run(feed_base_url: str | None = None):
             )
         last_scores[item_id] = score
 
-        if i % 25 == 0:
-            time.sleep(0.2)
-            logger.info("Scanned %d/%d top stories", i + 1, len(ids))
-
     crossed.sort(key=lambda x: x[0], reverse=True)
     crossed = crossed[:MAX_ITEMS_PER_GEN]
 
     now = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc)
-    new_entries = []
 
     if not crossed:
         logger.info("No new stories crossed threshold; generating feed with 0 items")
 
-    for score, item in crossed:
-        item_id = item["id"]
-        title = item.get("title", "(no title)")
-        hn_comments = f"https://news.ycombinator.com/item?id={item_id}"
-        main_url = item.get("url", "")
-        comments_count = item.get("descendants")
-        logger.info("Preparing digest entry for %s (%s points)", item_id, score)
-
-        thread_html = None
-        article_summary = "(no external link)"
-        if main_url:
-            logger.info("Fetching and summarizing article: %s", main_url)
-            try:
-                article_text = fetch_article_text(main_url)
-                article_summary = summarize(
-                    "You summarize articles for a technical audience. Keep it concise and focused on facts, one short paragraph.",
-                    f"Title: {title}\nURL: {main_url}\n\nArticle text:\n{article_text}",
-                )
-                logger.info("Article summary complete for %s", item_id)
-            except Exception as e:
-                article_summary = f"(failed to fetch/summarize article: {e})"
-                logger.warning("Failed to summarize article for %s: %s", item_id, e)
-        else:
-            # no external link; try HN text body or thread page
-            try:
-                body_html = item.get("text")
-                if body_html:
-                    article_text = strip_text_from_html(body_html)
-                else:
-                    if thread_html is None:
-                        thread_html = fetch_hn_thread_html(hn_comments)
-                    article_text = strip_text_from_html(thread_html)
-                article_summary = summarize(
-                    "You summarize Hacker News self-posts or thread content. Keep it concise and focused on the main subject, one short paragraph.",
-                    f"Title: {title}\nHN thread: {hn_comments}\n\nThread text:\n{article_text}",
-                )
-                logger.info(
-                    "Article summary (HN self-post/thread) complete for %s", item_id
-                )
-            except Exception as e:
-                article_summary = f"(failed to summarize HN post/thread: {e})"
-                logger.warning(
-                    "Failed to summarize HN post/thread for %s: %s", item_id, e
-                )
-
-        logger.info("Fetching and summarizing comments: %s", hn_comments)
-        try:
-            if thread_html is None:
-                thread_html = fetch_hn_thread_html(hn_comments)
-            comments_html = thread_html
-            comments_summary = summarize(
-                "You summarize Hacker News comment threads from the raw HTML page. Output two parts:\n1) 'Top upvoted themes:' 3-5 bullets reflecting the most upvoted or most visible comments/threads and their arguments (group similar ideas).\n2) 'Overall discussion:' one concise paragraph capturing main themes and disagreements. Avoid quotes and usernames. Focus on the visible ordering of comments as presented in the HTML.",
-                f"HN thread: {hn_comments}\nTitle: {title}\n\nHN thread HTML:\n{comments_html}",
-            )
-            logger.info("Comments summary complete for %s", item_id)
-        except Exception as e:
-            comments_summary = f"(failed to fetch/summarize comments: {e})"
-            logger.warning("Failed to summarize comments for %s: %s", item_id, e)
-
-        new_entries.append(
-            {
-                "id": item_id,
-                "title": title,
-                "score": score,
-                "comments": hn_comments,
-                "link": main_url,
-                "comments_count": comments_count,
-                "article_summary": article_summary,
-                "comments_summary": comments_summary,
-                "published_at": datetime.datetime.utcfromtimestamp(
-                    int(item.get("time", now.timestamp()))
-                ).replace(tzinfo=datetime.timezone.utc),
-            }
-        )
-
-        seen_keys.add(
-            entry_key(
-                {
-                    "id": item_id,
-                    "comments": hn_comments,
-                    "link": main_url,
-                    "title": title,
-                }
-            )
-        )
+    summary_index = build_summary_index(feed_history)
+    new_entries = asyncio.run(process_crossed(crossed, now, summary_index))
 
-    combined = {}
-    for e in feed_history:
-        combined[entry_key(e)] = e
-    for e in new_entries:
-        combined[entry_key(e)] = e
+    combined = dict(history_by_key)
+    combined.update((entry_key(e), e) for e in new_entries)
 
     sorted_entries = sorted(
         combined.values(),
@@ -501,6 +761,7 @@ def run(feed_base_url: str | None = None):
     save_state(
         {
             "last_scores": {str(k): v for k, v in last_scores.items()},
+            "last_fetched": {str(k): v for k, v in last_fetched.items()},
             "feed_entries": sorted_entries,
         }
     )